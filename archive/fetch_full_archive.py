@@ -3,8 +3,12 @@ import json
 import os
 import time
 import csv
+import sys
 from tqdm import tqdm  # Import progress bar
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from proxy_control import ProxyClient, CircuitOpenError
+
 # Load credentials from environment variables
 SCRAPEOPS_API_KEY = os.getenv("SCRAPE_PROXY_KEY")
 SCRAPEOPS_ENDPOINT = "https://proxy.scrapeops.io/v1/"
@@ -12,6 +16,9 @@ OUTPUT_JSON_FILE = "./data/truth_archive_full.json"
 OUTPUT_CSV_FILE = "./data/truth_archive_full.csv"
 BASE_URL = "https://truthsocial.com/api/v1/accounts/107780257626128497/statuses"
 
+# Sequential fetcher: the client adds overload retries and the circuit breaker
+PROXY = ProxyClient()
+
 def scrape(url, headers=None):
     """
     Makes a GET request to the target URL through the ScrapeOps proxy.
@@ -30,7 +37,7 @@ def scrape(url, headers=None):
         'bypass': 'cloudflare_level_1'
     }
 
-    response = session.get(SCRAPEOPS_ENDPOINT, params=proxy_params, timeout=120)
+    response = PROXY.get(SCRAPEOPS_ENDPOINT, session=session, params=proxy_params, timeout=120)
     response.raise_for_status()
     
     return response.json()
@@ -142,6 +149,10 @@ def fetch_all_posts():
                 success = True  # Request succeeded, exit retry loop
                 break  # Exit retry loop
                 
+            except CircuitOpenError as e:
+                print(f"❌ Proxy unavailable: {e}")
+                break  # Retrying would fail immediately; save what we have
+
             except requests.exceptions.RequestException as e:
                 print(f"❌ Error on attempt {attempt + 1}: {e}")
                 time.sleep(1**attempt)  # Exponential backoff before retrying
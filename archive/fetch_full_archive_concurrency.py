@@ -1,11 +1,15 @@
 import requests
 import json
 import os
+import sys
 import time
 import csv
 import concurrent.futures
 from tqdm import tqdm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from proxy_control import ProxyClient, AdaptiveLimiter
+
 # Load credentials from environment variables
 SCRAPEOPS_API_KEY = os.getenv("SCRAPE_PROXY_KEY")
 SCRAPEOPS_ENDPOINT = "https://proxy.scrapeops.io/v1/"
@@ -14,6 +18,9 @@ OUTPUT_CSV_FILE = "./data/truth_archive_full.csv"
 BASE_URL = "https://truthsocial.com/api/v1/accounts/107780257626128497/statuses"
 CONCURRENT_REQUESTS = 5  # ScrapeOps allows 5 concurrent requests
 
+# Threads are capped at CONCURRENT_REQUESTS; the limiter decides how many are in flight
+PROXY = ProxyClient(limiter=AdaptiveLimiter(initial=2, max_limit=CONCURRENT_REQUESTS))
+
 def scrape(url, headers=None):
     """ Makes a GET request through the ScrapeOps proxy. """
     if not SCRAPEOPS_API_KEY:
@@ -30,7 +37,7 @@ def scrape(url, headers=None):
         'bypass': 'cloudflare_level_1'
     }
 
-    response = session.get(SCRAPEOPS_ENDPOINT, params=proxy_params, timeout=120)
+    response = PROXY.get(SCRAPEOPS_ENDPOINT, session=session, params=proxy_params, timeout=120)
     response.raise_for_status()
     
     return response.json()
@@ -100,13 +107,17 @@ def extract_posts(json_response):
     return extracted_data
 
 def fetch_posts_batch(max_ids):
-    """ Fetches multiple pages concurrently given a list of max_ids. """
+    """
+    Fetches multiple pages concurrently given a list of max_ids.
+    Returns (posts, failed_max_ids) so failed pages can be retried.
+    """
     headers = {
         'accept': 'application/json, text/plain, */*',
         'referer': 'https://truthsocial.com/@realDonaldTrump'
     }
 
     results = []
+    failed = []
     with concurrent.futures.ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as executor:
         future_to_id = {
             executor.submit(scrape, f"{BASE_URL}?exclude_replies=true&only_replies=false&with_muted=true&limit=20&max_id={max_id}", headers): max_id
@@ -121,8 +132,9 @@ def fetch_posts_batch(max_ids):
                     results.extend(new_posts)
             except Exception as e:
                 print(f"❌ Error fetching batch {future_to_id[future]}: {e}")
+                failed.append(future_to_id[future])
 
-    return results
+    return results, failed
 
 def fetch_missing_posts():
     """
@@ -133,24 +145,50 @@ def fetch_missing_posts():
     all_posts = existing_posts[:]
     request_count = 0
     max_ids = [oldest_post_id] if oldest_post_id else []
+    retries = {}
+    abandoned = []  # pages that failed every retry; backfill these later
 
     print("🔄 Fetching older posts with concurrency...")
 
     with tqdm(desc="Fetching requests", unit="requests") as progress_bar:
         while max_ids:
             # Fetch posts in parallel batches
-            new_posts = fetch_posts_batch(max_ids)
-
-            if not new_posts:
-                print("✅ No more older posts found. Archive is complete.")
-                break
+            new_posts, failed = fetch_posts_batch(max_ids)
+
+            # Retry failed pages in the next batch; give up on a page after 3 tries
+            retry_ids = []
+            for max_id in failed:
+                retries[max_id] = retries.get(max_id, 0) + 1
+                if retries[max_id] < 3:
+                    retry_ids.append(max_id)
+                else:
+                    print(f"❌ Giving up on page max_id={max_id} after 3 tries.")
+                    abandoned.append(max_id)
 
             # Sort new posts (most recent first) & extend archive
             new_posts.sort(key=lambda post: post["created_at"], reverse=True)
             all_posts.extend(new_posts)
 
+            # Paging past a lost page would leave a silent gap, so stop here
+            if abandoned:
+                print("❌ Stopping at the first lost page. Saving progress; re-run later to resume.")
+                break
+
+            if PROXY.breaker.state == "open":
+                print("❌ Proxy circuit is open. Saving progress; re-run later to resume.")
+                break
+
+            if not new_posts and retry_ids:
+                max_ids = retry_ids
+                time.sleep(1)
+                continue
+
+            if not new_posts:
+                print("✅ No more older posts found. Archive is complete.")
+                break
+
             # Prepare next batch of max_ids for concurrent fetching
-            max_ids = [post["id"] for post in new_posts[-CONCURRENT_REQUESTS:]]  # Fetch older posts
+            max_ids = retry_ids + [post["id"] for post in new_posts[-CONCURRENT_REQUESTS:]]  # Fetch older posts
             request_count += len(new_posts)
             progress_bar.update(len(new_posts))
 
@@ -164,6 +202,8 @@ def fetch_missing_posts():
     save_to_csv(all_posts, OUTPUT_CSV_FILE)
 
     print(f"✅ Archive update complete. Total posts saved: {len(all_posts)}.")
+    if abandoned:
+        print(f"⚠️ Pages not fetched (max_id): {', '.join(abandoned)}")
 
 if __name__ == "__main__":
     fetch_missing_posts()
\ No newline at end of file
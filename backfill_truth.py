@@ -7,17 +7,21 @@ from dateutil import parser as dtp
 import requests
 import argparse
 from pathlib import Path
+from dedup_index import update_index
+from rollups import update_rollups
+from proxy_control import ProxyClient
 
 BASE = "https://proxy.scrapeops.io/v1/"
 TS_HOST = "https://truthsocial.com"
 USER = "realDonaldTrump"
 KEY = os.getenv("SCRAPE_PROXY_KEY")
+PROXY = ProxyClient(max_retries=4)  # no run budget; backfills are run by hand
 
 def sx(url, params=None):
     # wrap target URL for ScrapeOps; urlenc b/c target may have its own query
     q = {'api_key': KEY, 'url': url}
     if params: url = f"{url}?{urlencode(params)}"
-    return requests.get(BASE, params=urlencode({'api_key': KEY, 'url': url}), timeout=120)
+    return PROXY.get(BASE, params=urlencode({'api_key': KEY, 'url': url}), timeout=120)
 
 def get_account_id():
     # try lookup; fallback to search (some servers disable lookup)
@@ -117,13 +121,18 @@ def main():
     out_path = Path(out_name)
 
     grabbed = []
-    for s in iter_statuses(acct_id, max_pages=400):  # plenty for 4 days
-        d = iso_to_dt(s['created_at']).date()
-        if d > end_d:  # still too new; keep paging
-            continue
-        if d < start_d:
-            break
-        grabbed.append(map_status(s))
+    try:
+        for s in iter_statuses(acct_id, max_pages=400):  # plenty for 4 days
+            d = iso_to_dt(s['created_at']).date()
+            if d > end_d:  # still too new; keep paging
+                continue
+            if d < start_d:
+                break
+            grabbed.append(map_status(s))
+    except requests.RequestException as e:
+        # keep what we have; ids dedupe on merge, so re-running the same range later is safe
+        print(f"❌ Error fetching statuses: {e}")
+        print(f"⚠️ Saving {len(grabbed)} posts fetched so far; resume later by re-running {args.start} {args.end}.")
 
     # write minimal artifact
     with open(out_path, 'w', encoding='utf-8') as f:
@@ -141,6 +150,8 @@ def main():
         merged.sort(key=lambda x: x['created_at'], reverse=True)
         write_json(jpath, merged)
         print(f"Merged {len(new)} new posts into {jpath}")
+        update_index(merged, 'truth_archive_minhash.json')
+        update_rollups(merged, 'truth_archive_rollups.json')
         if args.csv:
             merge_into_csv('truth_archive.csv', new)
             print("Updated truth_archive.csv")
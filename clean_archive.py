@@ -2,6 +2,12 @@ import os
 import json
 import re
 import csv
+import argparse
+import concurrent.futures
+
+# Posts per chunk handed to each worker process; large enough that the
+# pickling overhead of shipping a chunk is small next to the ftfy work.
+DEFAULT_CHUNK_SIZE = 500
 
 # Try to import ftfy to robustly fix encoding issues
 try:
@@ -28,6 +34,30 @@ def process_post(post):
     post["content"] = clean_text
     return post
 
+def process_chunk(chunk):
+    """Clean a list of posts. Runs inside a worker process."""
+    return [process_post(post) for post in chunk]
+
+def chunked(posts, chunk_size):
+    """Split posts into consecutive lists of at most chunk_size items."""
+    return [posts[i:i + chunk_size] for i in range(0, len(posts), chunk_size)]
+
+def clean_posts(posts, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Clean every post, splitting the archive into chunks across a process pool.
+    executor.map yields results in submission order, so the output keeps the
+    input order. With workers=1 (or a single chunk) everything runs in-process.
+    """
+    chunks = chunked(posts, chunk_size)
+    if workers == 1 or len(chunks) <= 1:
+        return [process_post(post) for post in posts]
+
+    cleaned = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(process_chunk, chunks):
+            cleaned.extend(chunk)
+    return cleaned
+
 def load_archive(file_path):
     """Load posts from a JSON archive."""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -59,11 +89,34 @@ def save_csv(data, file_path):
                 post.get("favourites_count", 0)
             ])
 
+def save_outputs(data, exporters):
+    """
+    Run each (save_function, file_path) exporter on its own thread.
+    The writers only read the cleaned posts, so they can share the list.
+    JSON/CSV encoding holds the GIL, so this only overlaps the file I/O;
+    it is not a CPU speedup.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(exporters)) as executor:
+        futures = [executor.submit(save, data, path) for save, path in exporters]
+        for future in futures:
+            future.result()  # re-raise any write error
+
 def main():
     # Define input and output file paths
     INPUT_JSON_FILE = "./src/data/truth_archive.json"
     OUTPUT_JSON_FILE = "./src/data/truth_archive_scrubbed.json"
     OUTPUT_CSV_FILE = "./src/data/truth_archive_scrubbed.csv"
+
+    ap = argparse.ArgumentParser(description="Strip HTML and fix Unicode in the archive.")
+    ap.add_argument('--workers', type=int, default=None,
+                    help='worker processes for cleaning (default: CPU count; 1 = no pool)')
+    ap.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                    help='posts per worker chunk')
+    args = ap.parse_args()
+    if args.workers is not None and args.workers < 1:
+        ap.error("--workers must be at least 1")
+    if args.chunk_size < 1:
+        ap.error("--chunk-size must be at least 1")
     
     try:
         posts = load_archive(INPUT_JSON_FILE)
@@ -71,12 +124,14 @@ def main():
         print(f"Error reading {INPUT_JSON_FILE}: {e}")
         return
 
-    # Process each post to clean its content
-    cleaned_posts = [process_post(post) for post in posts]
+    # Clean posts in parallel chunks, preserving archive order
+    cleaned_posts = clean_posts(posts, workers=args.workers, chunk_size=args.chunk_size)
     
-    # Save cleaned data to new JSON and CSV files
-    save_json(cleaned_posts, OUTPUT_JSON_FILE)
-    save_csv(cleaned_posts, OUTPUT_CSV_FILE)
+    # Save cleaned data to new JSON and CSV files concurrently
+    save_outputs(cleaned_posts, [
+        (save_json, OUTPUT_JSON_FILE),
+        (save_csv, OUTPUT_CSV_FILE),
+    ])
     
     print("Archive scrubbed successfully.")
     print(f"JSON output: {OUTPUT_JSON_FILE}")
@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import html
+import random
+import hashlib
+import argparse
+
+# MinHash / LSH parameters. NUM_PERM = BANDS * ROWS. With 16 bands of 8 rows
+# two posts collide in some band with ~24% probability at Jaccard 0.6, ~95%
+# at 0.8 and ~100% at 0.9. Candidates are then checked against
+# SIMILARITY_THRESHOLD using the signature estimate. With 128 permutations
+# its standard error near 0.8 is ~0.035, which keeps borderline pairs from
+# chaining unrelated posts into one cluster.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.8
+SEED = 1789
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(SEED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+def normalize_text(text):
+    """Strip HTML tags and entities, lowercase, and split into word tokens."""
+    text = html.unescape(re.sub(r'<.*?>', ' ', text or ''))
+    return re.findall(r'\w+', text.lower())
+
+def shingles(post):
+    """
+    Build the feature set for a post: word shingles of its content plus one
+    feature per media URL, so media-only reposts still match each other.
+    """
+    words = normalize_text(post.get("content", ""))
+    features = set()
+    if len(words) < SHINGLE_SIZE:
+        if words:
+            features.add(" ".join(words))
+    else:
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            features.add(" ".join(words[i:i + SHINGLE_SIZE]))
+    for url in post.get("media", []) or []:
+        if url:
+            features.add("media:" + url)
+    return features
+
+def _hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def minhash(features):
+    """Return the MinHash signature (list of NUM_PERM ints) of a feature set."""
+    hashes = [_hash(f) for f in features]
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+def similarity(sig_a, sig_b):
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive index over post signatures. Posts are added one at a
+    time; each is compared only with posts sharing an LSH band, and matches
+    are joined into clusters with a union-find. Each bucket keeps one
+    representative per cluster, so repeated statements don't grow their
+    buckets (or the comparisons against them) with every repeat.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = {}
+        self.parent = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, post_id):
+        return post_id in self.signatures
+
+    def _find(self, post_id):
+        root = post_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[post_id] != root:
+            self.parent[post_id], post_id = root, self.parent[post_id]
+        return root
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def _band_keys(self, signature):
+        return [(band, tuple(signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+    def _bucket(self, post_id, band_keys):
+        """Add post_id to each bucket that has no member of its cluster yet."""
+        root = self._find(post_id)
+        for key in band_keys:
+            bucket = self.buckets.setdefault(key, [])
+            if not any(self._find(member) == root for member in bucket):
+                bucket.append(post_id)
+
+    def add_signature(self, post_id, signature):
+        """Insert a precomputed signature. Returns ids of newly matched posts."""
+        if post_id in self.signatures:
+            return []
+        band_keys = self._band_keys(signature)
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self.buckets.get(key, ()))
+
+        self.signatures[post_id] = signature
+        self.parent[post_id] = post_id
+        matches = []
+        for other in candidates:
+            if self._find(other) == self._find(post_id):
+                continue  # already joined that cluster through another candidate
+            if similarity(signature, self.signatures[other]) >= self.threshold:
+                matches.append(other)
+                self._union(post_id, other)
+        self._bucket(post_id, band_keys)
+        return matches
+
+    def add(self, post):
+        """Index a post dict. Posts with no text and no media are skipped."""
+        post_id = post.get("id")
+        if post_id is None or post_id in self.signatures:
+            return []
+        features = shingles(post)
+        if not features:
+            return []
+        return self.add_signature(post_id, minhash(features))
+
+    def add_posts(self, posts):
+        """Index a batch of posts. Returns the number of newly indexed posts."""
+        before = len(self.signatures)
+        for post in posts:
+            self.add(post)
+        return len(self.signatures) - before
+
+    def clusters(self, min_size=2):
+        """Return groups of near-duplicate post ids, largest first."""
+        groups = {}
+        for post_id in self.signatures:
+            groups.setdefault(self._find(post_id), []).append(post_id)
+        result = [sorted(g) for g in groups.values() if len(g) >= min_size]
+        result.sort(key=len, reverse=True)
+        return result
+
+    def save(self, file_path):
+        """
+        Persist signatures as compact hex strings (8 chars per value), plus
+        each post's cluster root so load() doesn't re-verify every pair.
+        """
+        data = {
+            "num_perm": NUM_PERM,
+            "bands": BANDS,
+            "shingle_size": SHINGLE_SIZE,
+            "seed": SEED,
+            "threshold": self.threshold,
+            "signatures": {
+                post_id: "".join(f"{v:08x}" for v in sig)
+                for post_id, sig in self.signatures.items()
+            },
+            "clusters": {
+                post_id: self._find(post_id)
+                for post_id in self.signatures
+                if self._find(post_id) != post_id
+            },
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a saved index. Clusters come from the saved roots and buckets
+        are rebuilt from the signatures without any similarity checks; an
+        index built with different parameters is discarded. Files saved
+        before roots were stored are replayed through add_signature.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls()
+        params = (data.get("num_perm"), data.get("bands"), data.get("shingle_size"),
+                  data.get("seed"), data.get("threshold"))
+        if params != (NUM_PERM, BANDS, SHINGLE_SIZE, SEED, SIMILARITY_THRESHOLD):
+            print(f"⚠️ Index {file_path} was built with different parameters. Rebuilding.")
+            return index
+        signatures = {
+            post_id: [int(hexsig[i:i + 8], 16) for i in range(0, len(hexsig), 8)]
+            for post_id, hexsig in data.get("signatures", {}).items()
+        }
+        if "clusters" not in data:
+            for post_id, sig in signatures.items():
+                index.add_signature(post_id, sig)
+            return index
+
+        roots = data["clusters"]
+        index.signatures = signatures
+        index.parent = {post_id: roots.get(post_id, post_id) for post_id in signatures}
+        for post_id, sig in signatures.items():
+            index._bucket(post_id, index._band_keys(sig))
+        return index
+
+def update_index(posts, file_path):
+    """
+    Load the index at file_path (or start a new one), add any posts not yet
+    indexed, and save it back. Returns the updated index.
+    """
+    index = NearDuplicateIndex()
+    if os.path.exists(file_path):
+        try:
+            index = NearDuplicateIndex.load(file_path)
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"⚠️ Error reading index {file_path}: {e}. Rebuilding.")
+    added = index.add_posts(posts)
+    index.save(file_path)
+    print(f"Indexed {added} new posts for near-duplicate detection ({len(index)} total).")
+    return index
+
+def main():
+    ap = argparse.ArgumentParser(description="Cluster near-duplicate posts in the archive.")
+    ap.add_argument('archive', nargs='?', default='truth_archive.json', help='archive JSON file')
+    ap.add_argument('--index', help='persisted index file to load and update')
+    ap.add_argument('--out', help='write clusters to this JSON file')
+    ap.add_argument('--min-size', type=int, default=2, help='smallest cluster to report')
+    args = ap.parse_args()
+
+    with open(args.archive, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+
+    if args.index:
+        index = update_index(posts, args.index)
+    else:
+        index = NearDuplicateIndex()
+        index.add_posts(posts)
+
+    clusters = index.clusters(min_size=args.min_size)
+    by_id = {post["id"]: post for post in posts}
+    for group in clusters:
+        sample = by_id.get(group[0], {})
+        preview = " ".join(normalize_text(sample.get("content", "")))[:80] or "; ".join(sample.get("media", []))[:80]
+        print(f"{len(group):4d}  {preview}")
+    print(f"{len(clusters)} clusters covering {sum(len(g) for g in clusters)} posts.")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(clusters, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import time
+import threading
+import requests
+
+# Statuses that mean "slow down" rather than "this request is wrong".
+# ScrapeOps passes upstream 429/5xx through and reports failed Cloudflare
+# bypasses as 5xx (or a 403 challenge page).
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+CLOUDFLARE_MARKERS = ("cf-chl", "cf_chl", "Just a moment...", "Attention Required! | Cloudflare")
+# Bad API key or exhausted ScrapeOps credits. Retrying won't help, but every
+# later call will fail the same way, so these count toward opening the breaker.
+AUTH_FAILURE_STATUSES = {401, 403}
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling the proxy while the circuit is open or the run budget is spent."""
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After failure_threshold consecutive failures
+    the circuit opens and calls fail immediately; after reset_timeout seconds
+    one probe call is let through (half-open) and its result closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self.lock:
+            state = self._state()
+            if state == "open" or (state == "half-open" and self.probing):
+                raise CircuitOpenError(f"Circuit open after {self.failures} consecutive proxy failures")
+            if state == "half-open":
+                self.probing = True
+
+    def release_probe(self):
+        """End a half-open probe without a verdict (e.g. the call never ran)."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.probing:
+                    print(f"⚠️ Circuit breaker opened after {self.failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit. Each healthy response (success within
+    target_latency) adds 1/limit, so the limit grows by about one per round of
+    requests; each overload response halves it. Callers block in acquire()
+    until fewer than int(limit) requests are in flight.
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=5, target_latency=30.0, backoff=0.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.in_flight < int(self.limit), timeout=timeout):
+                raise CircuitOpenError("Timed out waiting for a proxy slot")
+            self.in_flight += 1
+
+    def release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def on_success(self, latency):
+        with self.cond:
+            if latency <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.cond.notify_all()
+
+    def on_overload(self):
+        with self.cond:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+def is_overloaded(response):
+    """True for 429/5xx responses and Cloudflare challenge pages."""
+    if response.status_code in OVERLOAD_STATUSES:
+        return True
+    if response.status_code == 403:
+        body = response.text[:2048]
+        return any(marker in body for marker in CLOUDFLARE_MARKERS)
+    return False
+
+class ProxyClient:
+    """
+    Wraps GET requests to the proxy with an AdaptiveLimiter, a CircuitBreaker,
+    bounded retries on overload, and an overall time budget for the run.
+    Once the budget is spent or the circuit opens, calls raise
+    CircuitOpenError (a RequestException) so callers stop and save what they have.
+    """
+
+    def __init__(self, limiter=None, breaker=None, max_retries=3, base_delay=2.0, max_delay=60.0, budget=None):
+        self.limiter = limiter or AdaptiveLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = time.monotonic() + budget if budget else None
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _check_budget(self):
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise CircuitOpenError("Run time budget exhausted; stopping proxy calls")
+        return remaining
+
+    def _sleep(self, attempt, response=None):
+        delay = self.base_delay * (2 ** attempt)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        delay = min(delay, self.max_delay)  # never trust Retry-After to be sane
+        remaining = self.remaining()
+        if remaining is not None:
+            delay = min(delay, max(0, remaining))
+        time.sleep(delay)
+
+    def _backoff_or_fail(self, attempt, response=None):
+        """Sleep before a retry, unless the last failure opened the circuit."""
+        if self.breaker.state == "open":
+            raise CircuitOpenError(f"Circuit open after {self.breaker.failures} consecutive proxy failures")
+        self._sleep(attempt, response)
+
+    def _call(self, getter, url, timeout, remaining, **kwargs):
+        """
+        Make one call inside a limiter slot and return (response, latency).
+        Latency is timed from when the slot is acquired, so time queued
+        behind our own limiter doesn't count against the upstream. Any exit
+        that isn't a RequestException (slot timeout, unexpected error) ends
+        a half-open probe so the breaker can still close later.
+        """
+        try:
+            self.limiter.acquire(timeout=remaining)
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        try:
+            start = time.monotonic()
+            call_timeout = timeout if remaining is None else max(1, min(timeout, remaining))
+            response = getter(url, timeout=call_timeout, **kwargs)
+            return response, time.monotonic() - start
+        except requests.exceptions.RequestException:
+            raise
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        finally:
+            self.limiter.release()
+
+    def get(self, url, session=None, timeout=120, **kwargs):
+        """
+        GET url (via session if given) and return the final response. Overload
+        responses and request errors are retried with backoff; other
+        responses are returned as-is for the caller to inspect. Only 2xx/3xx
+        responses count as healthy and grow the concurrency limit.
+        """
+        getter = session.get if session is not None else requests.get
+        for attempt in range(self.max_retries + 1):
+            remaining = self._check_budget()
+            self.breaker.before_call()
+            try:
+                response, latency = self._call(getter, url, timeout, remaining, **kwargs)
+            except CircuitOpenError:
+                raise  # no slot freed up in time; not an upstream failure
+            except requests.exceptions.RequestException as e:
+                self.breaker.record_failure()
+                self.limiter.on_overload()
+                if attempt == self.max_retries:
+                    raise
+                print(f"⚠️ Proxy error ({e}); retrying.")
+                self._backoff_or_fail(attempt)
+                continue
+
+            if is_overloaded(response):
+                self.breaker.record_failure()
+                self.limiter.on_overload()
+                if attempt == self.max_retries:
+                    return response
+                print(f"⚠️ Proxy returned {response.status_code}; backing off to {int(self.limiter.limit)} concurrent.")
+                self._backoff_or_fail(attempt, response)
+                continue
+
+            if response.status_code < 400:
+                self.breaker.record_success()
+                self.limiter.on_success(latency)
+            elif response.status_code in AUTH_FAILURE_STATUSES:
+                self.breaker.record_failure()
+            else:
+                # Other 4xx (400, 404...) are answers about this request, not
+                # the proxy's health: neither reset the breaker nor grow the limit
+                self.breaker.release_probe()
+            return response
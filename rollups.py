@@ -0,0 +1,184 @@
+import os
+import json
+import argparse
+from datetime import date, timedelta
+
+ENGAGEMENT_FIELDS = ["replies_count", "reblogs_count", "favourites_count"]
+GRANULARITIES = ["hourly", "daily", "weekly"]
+
+def empty_bucket():
+    bucket = {"posts": 0, "media_posts": 0, "media_items": 0}
+    for field in ENGAGEMENT_FIELDS:
+        bucket[f"{field}_sum"] = 0
+        bucket[f"{field}_max"] = 0
+    return bucket
+
+def merge_bucket(target, source):
+    """Fold one bucket's counts into another (sums add, maxima take the max)."""
+    for key, value in source.items():
+        if key.endswith("_max"):
+            target[key] = max(target.get(key, 0), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+def bucket_keys(created_at):
+    """
+    Return the (daily, hourly) bucket keys for a created_at timestamp.
+    Timestamps are UTC ISO strings (2025-03-09T10:41:28.605Z), so slicing
+    gives the day and hour without parsing.
+    """
+    return created_at[:10], created_at[:13]
+
+def new_rollups():
+    return {"daily": {}, "hourly": {}}
+
+def ids_path_for(file_path):
+    """Sidecar file holding the ids already counted into file_path."""
+    root, ext = os.path.splitext(file_path)
+    return f"{root}_ids{ext or '.json'}"
+
+def add_posts(rollups, posts, seen):
+    """
+    Add a batch of posts to the rollups in place. Posts whose id is in the
+    seen set are skipped and new ids are added to it, so the same batch can
+    be applied twice safely. Returns the number of posts added.
+    """
+    added = 0
+    for post in posts:
+        post_id = post.get("id")
+        created_at = post.get("created_at")
+        if post_id is None or not created_at or post_id in seen:
+            continue
+        seen.add(post_id)
+
+        stats = empty_bucket()
+        media = post.get("media", []) or []
+        stats["posts"] = 1
+        stats["media_posts"] = 1 if media else 0
+        stats["media_items"] = len(media)
+        for field in ENGAGEMENT_FIELDS:
+            value = post.get(field, 0) or 0
+            stats[f"{field}_sum"] = value
+            stats[f"{field}_max"] = value
+
+        day, hour = bucket_keys(created_at)
+        merge_bucket(rollups["daily"].setdefault(day, empty_bucket()), stats)
+        merge_bucket(rollups["hourly"].setdefault(hour, empty_bucket()), stats)
+        added += 1
+    return added
+
+def load_rollups(file_path):
+    """Load the bucket file. Only buckets are read, so queries stay O(buckets)."""
+    if not os.path.exists(file_path):
+        return new_rollups()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        rollups = json.load(f)
+    if not isinstance(rollups, dict) or not all(isinstance(rollups.get(k), dict) for k in ("daily", "hourly")):
+        raise ValueError(f"{file_path} is missing daily/hourly buckets")
+    return rollups
+
+def load_ids(file_path):
+    if not os.path.exists(file_path):
+        return set()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return set(json.load(f))
+
+def save_ids(ids, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(ids), f)
+
+def save_rollups(rollups, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(rollups, f, indent=2, sort_keys=True)
+
+def update_rollups(posts, file_path):
+    """
+    Load the rollups at file_path (or start new ones), add any posts not yet
+    counted, and save them back. Counted ids live in a sidecar file next to
+    it (see ids_path_for) that only this update path reads.
+    Returns the updated rollups.
+    """
+    ids_path = ids_path_for(file_path)
+    try:
+        rollups = load_rollups(file_path)
+        seen = load_ids(ids_path) | set(rollups.pop("post_ids", []))  # older files kept ids inline
+    except ValueError as e:  # includes json.JSONDecodeError
+        print(f"⚠️ Error reading rollups {file_path}: {e}. Rebuilding.")
+        rollups, seen = new_rollups(), set()
+    if rollups["daily"] and not seen:
+        # Buckets without their id sidecar would double count; callers pass
+        # the full merged archive, so rebuilding from it is exact.
+        print(f"⚠️ Missing {ids_path} for existing rollups. Rebuilding.")
+        rollups = new_rollups()
+    added = add_posts(rollups, posts, seen)
+    save_rollups(rollups, file_path)
+    save_ids(seen, ids_path)
+    print(f"Added {added} posts to rollups ({len(rollups['daily'])} days).")
+    return rollups
+
+def week_key(day):
+    """ISO week bucket (Monday's date) for a YYYY-MM-DD day key."""
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+def week_end(day):
+    """Sunday of the ISO week containing a YYYY-MM-DD day key."""
+    return (date.fromisoformat(week_key(day)) + timedelta(days=6)).isoformat()
+
+def query(rollups, granularity="daily", start=None, end=None):
+    """
+    Return [(bucket_key, stats)] sorted by key for the given granularity.
+    start/end are inclusive bounds (e.g. 2025-10-01 or 2025-10-01T06).
+    Daily and weekly queries only use the date part of a bound. Weekly
+    buckets are folded from daily ones, and the bounds are widened to whole
+    weeks (Monday to Sunday), so the first and last weeks are never partial.
+    Runs in O(buckets).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    source = rollups["hourly"] if granularity == "hourly" else rollups["daily"]
+    if granularity != "hourly":
+        start = start[:10] if start else start
+        end = end[:10] if end else end
+    if granularity == "weekly":
+        start = week_key(start) if start else start
+        end = week_end(end) if end else end
+
+    rows = {}
+    for key, stats in source.items():
+        if start and key[:len(start)] < start:
+            continue
+        if end and key[:len(end)] > end:
+            continue
+        if granularity == "weekly":
+            key = week_key(key)
+        merge_bucket(rows.setdefault(key, empty_bucket()), stats)
+    return sorted(rows.items())
+
+def main():
+    ap = argparse.ArgumentParser(description="Query posting frequency and engagement rollups.")
+    ap.add_argument('--rollups', default='truth_archive_rollups.json', help='rollups JSON file')
+    ap.add_argument('--granularity', choices=GRANULARITIES, default='daily')
+    ap.add_argument('--start', help='first bucket, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH)')
+    ap.add_argument('--end', help='last bucket, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH)')
+    ap.add_argument('--rebuild', metavar='ARCHIVE', help='rebuild rollups from an archive JSON file first')
+    args = ap.parse_args()
+
+    if args.rebuild:
+        with open(args.rebuild, 'r', encoding='utf-8') as f:
+            posts = json.load(f)
+        rollups, seen = new_rollups(), set()
+        add_posts(rollups, posts, seen)
+        save_rollups(rollups, args.rollups)
+        save_ids(seen, ids_path_for(args.rollups))
+    else:
+        rollups = load_rollups(args.rollups)
+
+    print(f"{'bucket':<14}{'posts':>7}{'media':>7}{'replies':>10}{'reblogs':>10}{'favourites':>12}{'max fav':>10}")
+    for key, stats in query(rollups, args.granularity, args.start, args.end):
+        print(f"{key:<14}{stats['posts']:>7}{stats['media_posts']:>7}"
+              f"{stats['replies_count_sum']:>10}{stats['reblogs_count_sum']:>10}"
+              f"{stats['favourites_count_sum']:>12}{stats['favourites_count_max']:>10}")
+
+if __name__ == "__main__":
+    main()
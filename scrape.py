@@ -4,18 +4,36 @@ import os
 import time
 import csv
 import re
+from dedup_index import update_index
+from rollups import update_rollups
+from proxy_control import ProxyClient, CircuitBreaker
 
 # Load credentials from environment variables
 SCRAPEOPS_API_KEY = os.getenv("SCRAPE_PROXY_KEY")
 SCRAPEOPS_ENDPOINT = "https://proxy.scrapeops.io/v1/"
 OUTPUT_JSON_FILE = "./data/truth_archive.json"
 OUTPUT_CSV_FILE = "./data/truth_archive.csv"
+DEDUP_INDEX_FILE = "./data/truth_archive_minhash.json"
+ROLLUPS_FILE = "./data/truth_archive_rollups.json"
 ARCHIVE_URL = "https://stilesdata.com/trump-truth-social-archive/truth_archive.json"
 BASE_URL = "https://truthsocial.com/api/v1/accounts/107780257626128497/statuses"
+RUN_BUDGET_SECONDS = 15 * 60  # leave headroom inside the workflow's 20-minute timeout
+REQUEST_TIMEOUT_SECONDS = 60  # per attempt; Cloudflare bypass is slow but rarely this slow
+MAX_RETRIES = 2
+
+# Shared across calls. The breaker opens within one call's retry cycle, so a
+# hung upstream costs at most 3 x 60s plus backoff before the run gives up.
+PROXY = ProxyClient(
+    breaker=CircuitBreaker(failure_threshold=MAX_RETRIES + 1),
+    max_retries=MAX_RETRIES,
+    budget=RUN_BUDGET_SECONDS,
+)
 
 def scrape(url, headers=None):
     """
     Makes a GET request to the target URL through the ScrapeOps proxy.
+    Overload responses are retried with backoff; raises CircuitOpenError
+    once the proxy keeps failing or the run budget is spent.
     """
     if not SCRAPEOPS_API_KEY:
         raise ValueError("Missing SCRAPE_PROXY_KEY environment variable")
@@ -30,7 +48,7 @@ def scrape(url, headers=None):
         'bypass': 'cloudflare_level_1'
     }
 
-    response = session.get(SCRAPEOPS_ENDPOINT, params=proxy_params, timeout=120)
+    response = PROXY.get(SCRAPEOPS_ENDPOINT, session=session, params=proxy_params, timeout=REQUEST_TIMEOUT_SECONDS)
     response.raise_for_status()
 
     return response.json()
@@ -168,6 +186,8 @@ def fetch_posts(max_pages=3):
 
     append_to_json_file(all_posts, OUTPUT_JSON_FILE)  # Save the updated archive in JSON
     append_to_csv_file(all_posts, OUTPUT_CSV_FILE)  # Save the archive in CSV format
+    update_index(all_posts, DEDUP_INDEX_FILE)  # Index new posts for near-duplicate detection
+    update_rollups(all_posts, ROLLUPS_FILE)  # Fold new posts into daily/hourly stats
 
     print(f"✅ Scraping complete. {len(new_posts) if new_posts else 0} new posts added.")
 